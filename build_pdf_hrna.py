@@ -1,5 +1,12 @@
 import os
+import numpy as np
 import pandas as pd
+
+# Per-attribute shape validation is expensive and only useful while
+# developing drawings; keep it on when RL_DEBUG=1 is set.
+from reportlab import rl_config
+rl_config.shapeChecking = 1 if os.environ.get("RL_DEBUG") == "1" else 0
+
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer
 )
@@ -7,48 +14,212 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib import colors
 from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from PIL import Image as PILImage
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import stringWidth
 import re
 import math
+import copy
+import threading
+from io import BytesIO
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from reportlab.graphics.shapes import Drawing, Rect, String
-from reportlab.graphics import colors
-from reportlab.platypus import Paragraph
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; numpy fallbacks are used instead
+    njit = None
+
+# Shared layout: built once per process, reused for every provider PDF
+PAGE_MARGIN = 0.75 * inch
+USABLE_WIDTH = LETTER[0] - 2 * PAGE_MARGIN
+
+# Built-in fonts only; resolve their metrics once so the stylesheet,
+# stringWidth checks and forked workers all share the loaded faces
+BODY_FONT = "Helvetica"
+BOLD_FONT = "Helvetica-Bold"
+
+for _font_name in (BODY_FONT, BOLD_FONT):
+    pdfmetrics.getFont(_font_name)
+
+STYLES = getSampleStyleSheet()
+
+if "HeaderText" not in STYLES:
+    STYLES.add(ParagraphStyle(
+        name="HeaderText",
+        fontName=BODY_FONT,
+        fontSize=12,
+        leading=16,
+        spaceAfter=14
+    ))
+
+    STYLES.add(ParagraphStyle(
+        name="TableCell",
+        fontName=BODY_FONT,
+        fontSize=11,
+        leading=15
+    ))
+
+    STYLES.add(ParagraphStyle(
+        name="TableHeader",
+        fontSize=12,
+        leading=14,
+        fontName=BOLD_FONT
+    ))
+
+COL_WIDTHS = [
+    USABLE_WIDTH * 0.3,
+    USABLE_WIDTH * 0.52
+]
+
+# Text width inside each body cell (column minus left/right padding)
+CELL_PADDING = 8
+CELL_TEXT_WIDTHS = [w - 2 * CELL_PADDING for w in COL_WIDTHS]
+
+BANNER_RGB = (0, 40, 80)
+
+HEADER_BG = colors.HexColor("#F4F6F9")
+HEADER_LINE = colors.HexColor("#DADDE2")
+ROW_LINE = colors.HexColor("#E6E9EF")
+TEXT_DARK = colors.HexColor("#1F2933")
+
+MEMBER_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), HEADER_BG),
+    ("TEXTCOLOR", (0, 0), (-1, 0), TEXT_DARK),
+    ("FONTNAME", (0, 0), (-1, 0), BOLD_FONT),
+    ("LINEBELOW", (0, 0), (-1, 0), 1, HEADER_LINE),
+    ("LINEBELOW", (0, 1), (-1, -1), 0.25, ROW_LINE),
+    # Body font for cells passed as plain strings (matches TableCell)
+    ("FONTNAME", (0, 1), (-1, -1), STYLES["TableCell"].fontName),
+    ("FONTSIZE", (0, 1), (-1, -1), STYLES["TableCell"].fontSize),
+    ("LEADING", (0, 1), (-1, -1), STYLES["TableCell"].leading),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("LEFTPADDING", (0, 0), (-1, -1), CELL_PADDING),
+    ("RIGHTPADDING", (0, 0), (-1, -1), CELL_PADDING),
+    ("BOTTOMPADDING", (0, 0), (-1, 0), 10),
+])
+
+LEGEND_COL_WIDTHS = [USABLE_WIDTH - 130, 130]  # pushes legend to the right
+
+LEGEND_TABLE_STYLE = TableStyle([
+    ("ALIGN", (1, 0), (1, 0), "RIGHT"),
+    ("VALIGN", (1, 0), (1, 0), "TOP"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 0),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+    ("TOPPADDING", (0, 0), (-1, -1), 0),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+])
+
+# Table cell: plain single-line text skips the Paragraph parser
+def table_cell(text, style, width):
+    """
+    Returns text as a raw string when it has no markup and fits on one
+    line (Table draws it with drawString); otherwise a wrapped Paragraph.
+    """
+    text = str(text)
+
+    if "<" in text or "&" in text:
+        return Paragraph(text, style)
+
+    text = " ".join(text.split())  # collapse whitespace like Paragraph does
+    if stringWidth(text, style.fontName, style.fontSize) > width:
+        return Paragraph(text, style)
+
+    return text
+
+# PDC bands, parsed once and shared by every heatmap and legend
+PDC_RED = colors.HexColor("#DC2626")
+PDC_AMBER = colors.HexColor("#F59E0B")
+PDC_GREEN = colors.HexColor("#16A34A")
+
+# Heatmap color codes: 0 = blank, 1 = red, 2 = amber, 3 = green
+PDC_COLOR_TABLE = (None, PDC_RED, PDC_AMBER, PDC_GREEN)
 
 #heatmap color
 def pdc_color(pdc):
     """
     Returns None for missing data (blank cell)
     """
-    if pdc is None:
+    if pdc is None or pdc != pdc:  # missing or NaN
         return None
 
-    try:
-        if math.isnan(pdc):
-            return None
-    except TypeError:
-        pass
-
     if pdc < 60:
-        return colors.HexColor("#DC2626")   # red
+        return PDC_RED
     elif pdc < 80:
-        return colors.HexColor("#F59E0B")   # amber
+        return PDC_AMBER
     else:
-        return colors.HexColor("#16A34A")   # green
+        return PDC_GREEN
+
+# PDC columns in heatmap order: measure-major, oldest year first
+PDC_MEASURES = ("Statin", "Diabetes", "RAS")
+PDC_PERIODS = ("Prior_2", "Prior_1", "Current")
+PDC_COLUMNS = [f"{m}_PDC_{p}" for m in PDC_MEASURES for p in PDC_PERIODS]
+
+def pdc_matrix(provider_df):
+    """
+    Returns the PDC columns as a (members, 9) float64 array in
+    PDC_COLUMNS order. Missing columns, missing values (None, NaN,
+    pd.NA, also inside object columns) and non-numeric text are NaN, so
+    callers can test validity with np.isnan alone.
+    """
+    pdc = provider_df.reindex(columns=PDC_COLUMNS)
+    pdc = pdc.apply(pd.to_numeric, errors="coerce")
+
+    return pdc.to_numpy(dtype=np.float64, na_value=np.nan)
+
+def precompute_pdc_colors(pdc):
+    """
+    pdc = pdc_matrix(provider_df)
+
+    Returns an int8 array of shape (members, measures, years) holding the
+    heatmap color code of every PDC cell. Missing values are blank.
+    """
+    codes = np.select(
+        [pdc < 60, pdc < 80, ~np.isnan(pdc)],
+        [1, 2, 3],
+        default=0
+    ).astype(np.int8)
+
+    return codes.reshape(len(pdc), len(PDC_MEASURES), len(PDC_PERIODS))
+
+# One Drawing per distinct (color pattern, size); members share them.
+# The lock keeps thread-pool workers from building the same entry twice.
+HEATMAP_CACHE = {}
+_HEATMAP_CACHE_LOCK = threading.Lock()
 
 #heatmap drawing
-def pdc_heatmap(measure_rows, width=120, height_per_row=18):
+def pdc_heatmap(color_codes, width=120, height_per_row=18):
     """
-    measure_rows = [
-        ("Statin",   [pdc_yy2, pdc_yy1, pdc_yy]),
-        ("Diabetes", [...]),
-        ...
-    ]
+    color_codes = one member's rows from precompute_pdc_colors(), e.g.
+        codes[i]                      -> all measures
+        build_measure_rows(codes, i)  -> only measures with data
     """
-    if not measure_rows:
+    key = (
+        tuple(tuple(int(c) for c in codes) for codes in color_codes),
+        width,
+        height_per_row
+    )
+
+    d = HEATMAP_CACHE.get(key)
+    if d is None:
+        with _HEATMAP_CACHE_LOCK:
+            d = HEATMAP_CACHE.get(key)
+            if d is None:
+                d = _build_pdc_heatmap(key[0], width, height_per_row)
+                HEATMAP_CACHE[key] = d
+
+    # Shallow copy shares the Rects but gives each table cell its own
+    # flowable state (canv, wrap size) while it is drawn
+    return copy.copy(d)
+
+def _build_pdc_heatmap(color_codes, width, height_per_row):
+    if len(color_codes) == 0:
         return Drawing(width, height_per_row)
 
-    rows = len(measure_rows)
+    rows = len(color_codes)
     cols = 3
     height = rows * height_per_row
 
@@ -57,11 +228,9 @@ def pdc_heatmap(measure_rows, width=120, height_per_row=18):
 
     d = Drawing(width, height)
 
-    for r, (_, values) in enumerate(measure_rows):
-        padded = (values + [None] * cols)[:cols]
-
-        for c, val in enumerate(padded):
-            color = pdc_color(val)
+    for r, codes in enumerate(color_codes):
+        for c in range(cols):
+            color = PDC_COLOR_TABLE[codes[c]] if c < len(codes) else None
             if color is None:
                 continue  # BLANK cell
 
@@ -92,9 +261,9 @@ def heatmap_legend(width=120, height=24):
     d = Drawing(width, height)
 
     items = [
-        ("< 60", colors.HexColor("#DC2626")),
-        ("60–79", colors.HexColor("#F59E0B")),
-        ("≥ 80", colors.HexColor("#16A34A")),
+        ("< 60", PDC_RED),
+        ("60–79", PDC_AMBER),
+        ("≥ 80", PDC_GREEN),
     ]
 
     x = 0
@@ -104,7 +273,12 @@ def heatmap_legend(width=120, height=24):
         x += 40
 
     return d
-#Heatmap column header (labels + legend)
+
+# The legend never changes; build it once and hand out shallow copies
+LEGEND_DRAWING = heatmap_legend()
+
+#Heatmap column header (labels + legend); a fresh Paragraph per document
+#since wrap/split mutate it, with the legend shared via a shallow copy
 def heatmap_header(report_period_year, styles):
     years = heatmap_year_headers(report_period_year)
 
@@ -113,39 +287,93 @@ def heatmap_header(report_period_year, styles):
             f"<b>PDC History</b><br/>{years[0]}&nbsp;&nbsp;{years[1]}&nbsp;&nbsp;{years[2]}",
             styles["TableHeader"]
         ),
-        heatmap_legend()
+        copy.copy(LEGEND_DRAWING)
     ]
 
     return header
+#Which measures have any PDC value, per member (members x 3 bool)
+if njit is not None:
+    @njit(cache=True)
+    def measure_mask(pdc):
+        """
+        pdc = pdc_matrix(provider_df); compiled once, called per provider
+        """
+        out = np.zeros((pdc.shape[0], 3), dtype=np.bool_)
+        for i in range(pdc.shape[0]):
+            for m in range(3):
+                s = m * 3
+                out[i, m] = not (
+                    math.isnan(pdc[i, s])
+                    and math.isnan(pdc[i, s + 1])
+                    and math.isnan(pdc[i, s + 2])
+                )
+        return out
+else:
+    def measure_mask(pdc):
+        """
+        pdc = pdc_matrix(provider_df); numpy fallback when numba is missing
+        """
+        return ~np.isnan(pdc.reshape(-1, 3, 3)).all(axis=2)
+
 #Build measure rows safely (2 or 3 measures supported)
-def build_measure_rows(row):
-    measure_defs = [
-        ("Statin", "Statin"),
-        ("Diabetes", "Diabetes"),
-        ("RAS", "RAS")
-    ]
+def build_measure_rows(color_codes, i, has_measure=None):
+    """
+    color_codes = precompute_pdc_colors(pdc); i = member row index
+    has_measure = optional precomputed measure_mask(pdc)[i]
+
+    Returns the member's color-code rows for measures with any PDC value,
+    ready to pass to pdc_heatmap()
+    """
+    member = color_codes[i]
 
-    rows = []
+    if has_measure is None:
+        has_measure = (member != 0).any(axis=1)  # 0 = blank cell
 
-    for label, prefix in measure_defs:
-        values = [
-            row.get(f"{prefix}_PDC_Prior_2"),
-            row.get(f"{prefix}_PDC_Prior_1"),
-            row.get(f"{prefix}_PDC_Current"),
-        ]
+    return member[has_measure]
+
+#One heatmap per member row; PDC columns are extracted and classified once
+def build_heatmaps(provider_df, width=120, height_per_row=18):
+    pdc = pdc_matrix(provider_df)
+    color_codes = precompute_pdc_colors(pdc)
+    has_measure = measure_mask(pdc)
+
+    return [
+        pdc_heatmap(
+            build_measure_rows(color_codes, i, has_measure[i]),
+            width=width,
+            height_per_row=height_per_row
+        )
+        for i in range(len(pdc))
+    ]
 
-        if any(v is not None and not (isinstance(v, float) and math.isnan(v)) for v in values):
-            rows.append((label, values))
 
-    return rows
+# decode the banner logo once; every PDF reuses the same reader
+def load_logo(logo_path):
+    if not logo_path or not os.path.exists(logo_path):
+        return None
+
+    # Bake any transparency (alpha band or tRNS key) onto the banner color
+    # so drawImage needs no mask
+    with PILImage.open(logo_path) as image:
+        if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+            rgba = image.convert("RGBA")
+            background = PILImage.new("RGBA", rgba.size, BANNER_RGB + (255,))
+            flat = PILImage.alpha_composite(background, rgba).convert("RGB")
+        else:
+            flat = image.convert("RGB")
 
+    logo = ImageReader(flat)
+    logo.getRGBData()  # decode once here rather than on the first PDF
+    return logo
 
 # cleanup names in the file
+_SAFE_RE = re.compile(r"[^\w\-]+")
+
 def safe_filename(value):
     if value is None:
         return "UNKNOWN"
     value = str(value).strip()
-    value = re.sub(r"[^\w\-]+", "_", value)
+    value = _SAFE_RE.sub("_", value)
     return value
 
 def first_page_header(
@@ -154,7 +382,7 @@ def first_page_header(
     provider,
     reporting_pod,
     report_period,
-    logo_path=None
+    logo=None
 ):
     canvas.saveState()
 
@@ -162,7 +390,7 @@ def first_page_header(
     page_width, page_height = LETTER
 
     # Banner background
-    canvas.setFillColorRGB(0/255, 40/255, 80/255)
+    canvas.setFillColorRGB(*(c / 255 for c in BANNER_RGB))
     canvas.rect(
         0,
         page_height - banner_height,
@@ -177,7 +405,7 @@ def first_page_header(
 
     # Main title
     canvas.setFillColor(colors.white)
-    canvas.setFont("Helvetica-Bold", 20)
+    canvas.setFont(BOLD_FONT, 20)
     canvas.drawString(
         left_x,
         top_y,
@@ -185,26 +413,31 @@ def first_page_header(
     )
 
     # Subtitle (provider | pod | date)
-    canvas.setFont("Helvetica", 12)
+    canvas.setFont(BODY_FONT, 12)
     canvas.drawString(
         left_x,
         top_y - 0.45 * inch,
         f"{provider} | {reporting_pod} | {report_period}"
     )
 
-    # Logo (large, padded, vertically centered)
-    if logo_path and os.path.exists(logo_path):
-        logo_height = banner_height - 0.35 * inch
-        logo_width = logo_height * 2.0  # assumes wide logo
+    # Logo (large, padded, vertically centered in a 2:1 box)
+    if logo is not None:
+        box_height = banner_height - 0.35 * inch
+        box_width = box_height * 2.0
+
+        # Fit the logo's known pixel size into the box here instead of
+        # having drawImage re-derive it (preserveAspectRatio) per PDF
+        img_width, img_height = logo.getSize()
+        scale = min(box_width / img_width, box_height / img_height)
+        logo_width = img_width * scale
+        logo_height = img_height * scale
 
         canvas.drawImage(
-            logo_path,
-            page_width - logo_width - 0.6 * inch,
-            page_height - banner_height + 0.175 * inch,
+            logo,
+            page_width - 0.6 * inch - (box_width + logo_width) / 2,
+            page_height - banner_height + 0.175 * inch + (box_height - logo_height) / 2,
             width=logo_width,
-            height=logo_height,
-            preserveAspectRatio=True,
-            mask="auto"
+            height=logo_height
         )
 
     canvas.restoreState()
@@ -220,11 +453,10 @@ def build_provider_pdf(
     npi,
     header_text,
     report_period,
-    logo_path=None,
+    logo=None,
     output_dir="output_pdfs"
     ):
-    os.makedirs(output_dir, exist_ok=True)
-
+    # output_dir is created once by the driver, not per provider
     filename_parts = [
         operational_market,
         operational_submarket,
@@ -237,36 +469,18 @@ def build_provider_pdf(
     filename = "_".join(safe_filename(p) for p in filename_parts) + ".pdf"
     filepath = os.path.join(output_dir, filename)
 
+    # Lay the PDF out in memory and write it with a single call
+    buf = BytesIO()
     doc = SimpleDocTemplate(
-        filepath,
+        buf,
         pagesize=LETTER,
-        leftMargin=0.75 * inch,
-        rightMargin=0.75 * inch,
+        leftMargin=PAGE_MARGIN,
+        rightMargin=PAGE_MARGIN,
         topMargin=1.9 * inch,   # space for banner
-        bottomMargin=0.75 * inch
+        bottomMargin=PAGE_MARGIN
     )
 
-    styles = getSampleStyleSheet()
-
-    styles.add(ParagraphStyle(
-        name="HeaderText",
-        fontSize=12,
-        leading=16,
-        spaceAfter=14
-    ))
-
-    styles.add(ParagraphStyle(
-        name="TableCell",
-        fontSize=11,
-        leading=15
-    ))
-
-    styles.add(ParagraphStyle(
-        name="TableHeader",
-        fontSize=12,
-        leading=14,
-        fontName="Helvetica-Bold"
-    ))
+    styles = STYLES
 
     story = []
 
@@ -287,54 +501,40 @@ def build_provider_pdf(
         Paragraph("PDC History<br/>24&nbsp;&nbsp;25&nbsp;&nbsp;26", styles["TableHeader"]),
     ]]
 
-    for _, row in provider_df.iterrows():
-        table_data.append([
-            Paragraph(str(row["member detail"]), styles["TableCell"]),
-            Paragraph(str(row["adherence breakdown"]), styles["TableCell"])
-        ])
-
-    usable_width = doc.width
-    col_widths = [
-        usable_width * 0.3,
-        usable_width * 0.52
+    # str() per value, as the row loop did: blanks render as "None"/"nan"
+    # (astype(str) leaves NaN as a float on newer pandas)
+    member_details = [
+        str(v) for v in provider_df["member detail"].to_numpy(dtype=object)
+    ]
+    adherence_breakdowns = [
+        str(v) for v in provider_df["adherence breakdown"].to_numpy(dtype=object)
     ]
+    cell_style = styles["TableCell"]
+
+    md_width, ab_width = CELL_TEXT_WIDTHS
+
+    table_data.extend(
+        [
+            table_cell(md, cell_style, md_width),
+            table_cell(ab, cell_style, ab_width)
+        ]
+        for md, ab in zip(member_details, adherence_breakdowns)
+    )
 
     table = Table(
         table_data,
-        colWidths=col_widths,
+        colWidths=COL_WIDTHS,
         repeatRows=1
     )
-    HEADER_BG = colors.HexColor("#F4F6F9")
-    ROW_LINE = colors.HexColor("#E6E9EF")
-    TEXT_DARK = colors.HexColor("#1F2933")
-
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), HEADER_BG),
-        ("TEXTCOLOR", (0, 0), (-1, 0), TEXT_DARK),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("LINEBELOW", (0, 0), (-1, 0), 1, colors.HexColor("#DADDE2")),
-        ("LINEBELOW", (0, 1), (-1, -1), 0.25, colors.HexColor("#E6E9EF")),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 8),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 10),
-    ]))
+    table.setStyle(MEMBER_TABLE_STYLE)
     # --- Heatmap legend ABOVE the table, right-aligned ---
 
     legend_table = Table(
-        [[ "", heatmap_legend() ]],
-        colWidths=[doc.width - 130, 130]  # pushes legend to the right
+        [[ "", copy.copy(LEGEND_DRAWING) ]],
+        colWidths=LEGEND_COL_WIDTHS
     )
-    
-    legend_table.setStyle(TableStyle([
-        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-        ("VALIGN", (1, 0), (1, 0), "TOP"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 0),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-        ("TOPPADDING", (0, 0), (-1, -1), 0),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-    ]))
-    
+    legend_table.setStyle(LEGEND_TABLE_STYLE)
+
     story.append(legend_table)
     story.append(Spacer(1, 6))
 
@@ -348,10 +548,12 @@ def build_provider_pdf(
                 provider=provider,
                 reporting_pod=reporting_pod,
                 report_period=REPORT_PERIOD,
-                logo_path=logo_path
+                logo=logo
             )
         )
 
+    with open(filepath, "wb") as f:
+        f.write(buf.getbuffer())
 
     print(f"Created: {filepath}")
 
@@ -383,22 +585,39 @@ opportunities for intervention.
 
 LOGO_PATH = "logo.png"  # set to None if not available
 REPORT_PERIOD = "Jan 2026"
+OUTPUT_DIR = "output_pdfs"
 
-for (
-    op_market,
-    op_submarket,
-    managing_entity,
-    pod,
-    provider,
-    npi
-), group_df in df.groupby([
+# "process" (default) or "thread"; threads avoid pickling group frames on
+# memory-bound hosts and still overlap the zlib/file-write work, which
+# runs without the GIL
+PDF_EXECUTOR = os.environ.get("PDF_EXECUTOR", "process")
+
+LOGO = load_logo(LOGO_PATH)
+
+GROUP_KEYS = [
     "OperationalMarket",
     "OperationalSubmarket",
     "ManagingEntity",
     "ReportingPod",
     "Provider",
     "NPI"
-]):
+]
+
+
+def _pdf_worker(item):
+    """
+    Builds one provider PDF from a ((keys...), group_df) pair; runs in a
+    worker process.
+    """
+    (
+        op_market,
+        op_submarket,
+        managing_entity,
+        pod,
+        provider,
+        npi
+    ), group_df = item
+
     build_provider_pdf(
         provider_df=group_df,
         operational_market=op_market,
@@ -409,6 +628,56 @@ for (
         npi=npi,
         header_text=HEADER_TEXT,
         report_period=REPORT_PERIOD,
-        logo_path=LOGO_PATH
+        logo=LOGO,
+        output_dir=OUTPUT_DIR
     )
 
+
+def main(df):
+    # Collapse the six keys into one integer code per row, then slice
+    # contiguous groups out of the frame sorted by that code. Group order
+    # does not matter, so skip the key sort and unobserved combinations.
+    # Only this key-only copy is categorical: slices of a categorical
+    # frame would carry (and pickle) every provider's categories.
+    keys = df[GROUP_KEYS].astype("category")
+    codes = keys.groupby(GROUP_KEYS, sort=False, observed=True).ngroup()
+
+    # groupby drops rows with a missing key; ngroup marks them NaN (-1 on
+    # older pandas). Leave them out so they never land in another
+    # provider's PDF.
+    keep = codes.ge(0).to_numpy()
+    df = df[keep]
+    codes = codes[keep].to_numpy(dtype=np.int64)
+
+    order = np.argsort(codes, kind="stable")
+    df = df.iloc[order]
+    codes = codes[order]
+
+    _, starts = np.unique(codes, return_index=True)
+    ends = np.append(starts[1:], len(df))
+    key_values = df[GROUP_KEYS].to_numpy()
+
+    group_items = [
+        (tuple(key_values[start]), df.iloc[start:end])
+        for start, end in zip(starts, ends)
+    ]
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # Every provider PDF is independent, so spread them over all cores.
+    # Workers only read the shared styles; cached drawings are handed out
+    # as copies and the heatmap cache is filled under a lock.
+    workers = os.cpu_count() or 1
+
+    if PDF_EXECUTOR == "thread":
+        with ThreadPoolExecutor(max_workers=min(8, workers)) as ex:
+            list(ex.map(_pdf_worker, group_items))
+    else:
+        # chunksize only matters across processes (amortizes IPC)
+        chunksize = max(1, len(group_items) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            list(ex.map(_pdf_worker, group_items, chunksize=chunksize))
+
+
+if __name__ == "__main__":
+    main(df)
@@ -0,0 +1,118 @@
+import os
+
+import pandas as pd
+from reportlab.platypus import Paragraph
+
+import build_pdf_hrna as hrna
+
+
+def _provider_rows(*rows):
+    """
+    rows = (OperationalMarket, Provider, NPI) per member
+    """
+    return pd.DataFrame({
+        "OperationalMarket": [r[0] for r in rows],
+        "OperationalSubmarket": ["SubmarketA"] * len(rows),
+        "ManagingEntity": ["EntityA"] * len(rows),
+        "ReportingPod": ["PodA"] * len(rows),
+        "Provider": [r[1] for r in rows],
+        "NPI": [r[2] for r in rows],
+        "member detail": [f"Member {i}" for i in range(len(rows))],
+        "adherence breakdown": ["PDC: 72%"] * len(rows),
+    })
+
+
+def _run_batch(df, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(hrna, "PDF_EXECUTOR", "thread")
+    hrna.main(df)
+    return sorted(os.listdir(tmp_path / hrna.OUTPUT_DIR))
+
+
+def test_rows_with_null_group_key_get_no_pdf(tmp_path, monkeypatch):
+    df = _provider_rows(
+        (None, "A", "111"),
+        (None, "B", "222"),
+        ("East", "C", "333"),
+    )
+
+    assert _run_batch(df, tmp_path, monkeypatch) == [
+        "East_SubmarketA_EntityA_PodA_C_333.pdf"
+    ]
+
+
+def test_each_observed_key_combination_gets_one_pdf(tmp_path, monkeypatch):
+    # Category keys make East/B and West/A possible but unobserved; the
+    # null-market row must not surface as a "nan" file either
+    df = _provider_rows(
+        ("East", "A", "111"),
+        ("West", "B", "222"),
+        ("East", "A", "111"),
+        (None, "B", "222"),
+    )
+
+    assert _run_batch(df, tmp_path, monkeypatch) == [
+        "East_SubmarketA_EntityA_PodA_A_111.pdf",
+        "West_SubmarketA_EntityA_PodA_B_222.pdf",
+    ]
+
+
+def test_pdc_matrix_turns_any_missing_value_into_nan():
+    df = pd.DataFrame({
+        "Statin_PDC_Prior_2": pd.Series([55, pd.NA, None], dtype=object),
+        "RAS_PDC_Current": pd.array([90, pd.NA, 70], dtype="Int64"),
+    })
+
+    pdc = hrna.pdc_matrix(df)
+
+    assert pdc.shape == (3, len(hrna.PDC_COLUMNS))
+    assert pdc[0, 0] == 55 and pdc[0, 8] == 90 and pdc[2, 8] == 70
+    assert pd.isna(pdc[1, 0]) and pd.isna(pdc[2, 0]) and pd.isna(pdc[1, 8])
+    assert pd.isna(pdc[:, 1:8]).all()
+
+
+def test_null_text_cells_render_instead_of_failing(tmp_path, monkeypatch):
+    df = _provider_rows(("East", "A", "111"), ("East", "A", "111"))
+    df["member detail"] = ["Member<br/>Alice", None]
+    df["adherence breakdown"] = ["PDC 72%<br/>Late", float("nan")]
+
+    assert _run_batch(df, tmp_path, monkeypatch) == [
+        "East_SubmarketA_EntityA_PodA_A_111.pdf"
+    ]
+
+
+def test_table_cell_keeps_plain_one_line_text_as_raw_string():
+    style = hrna.STYLES["TableCell"]
+
+    assert hrna.table_cell("Alice   Smith ", style, 200) == "Alice Smith"
+    assert hrna.table_cell(None, style, 200) == "None"
+    assert hrna.table_cell(float("nan"), style, 200) == "nan"
+
+
+def test_table_cell_wraps_text_that_is_too_wide():
+    style = hrna.STYLES["TableCell"]
+
+    cell = hrna.table_cell("word " * 40, style, 100)
+
+    assert isinstance(cell, Paragraph)
+
+
+def test_table_cell_parses_markup():
+    style = hrna.STYLES["TableCell"]
+
+    assert isinstance(hrna.table_cell("a<br/>b", style, 500), Paragraph)
+    assert isinstance(hrna.table_cell("A &amp; B", style, 500), Paragraph)
+
+
+def test_group_slices_sent_to_workers_are_not_categorical(tmp_path, monkeypatch):
+    sent = []
+    monkeypatch.setattr(hrna, "_pdf_worker", sent.append)
+    df = _provider_rows(("East", "A", "111"), ("West", "B", "222"))
+
+    _run_batch(df, tmp_path, monkeypatch)
+
+    assert len(sent) == 2
+    for _, group_df in sent:
+        assert not any(
+            isinstance(dtype, pd.CategoricalDtype) for dtype in group_df.dtypes
+        )